@@ -5,10 +5,14 @@ This module defines Azure resource shapes using Draw.io's built-in Azure2 icon l
 The icons are SVG-based and render properly in Draw.io and VS Code Draw.io extension.
 """
 
-from typing import Dict, Optional, Tuple
+import functools
+import sys
+import types
+from collections import defaultdict
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
 
 # Azure brand colors (for fallback styling)
-AZURE_COLORS = {
+_AZURE_COLORS_RAW: Dict[str, str] = {
     'primary': '#0078D4',      # Azure Blue
     'compute': '#0078D4',      # Blue
     'network': '#59B4D9',      # Light Blue
@@ -26,6 +30,9 @@ AZURE_COLORS = {
     'general': '#32CD32',      # Lime Green
     'containers': '#326CE5',   # Kubernetes Blue
 }
+AZURE_COLORS: Mapping[str, str] = types.MappingProxyType(
+    {sys.intern(category): sys.intern(color) for category, color in _AZURE_COLORS_RAW.items()}
+)
 
 # Default dimensions for shapes - compact for A4/PowerPoint diagrams
 DEFAULT_WIDTH = 60
@@ -34,17 +41,21 @@ ICON_SIZE = 40  # Small icons for compact layouts
 
 # Base style for Draw.io Azure2 icons (SVG-based)
 # This uses the built-in Azure icon library from Draw.io
-AZURE_ICON_BASE_STYLE = (
+AZURE_ICON_BASE_STYLE = sys.intern(
     "image;aspect=fixed;html=1;points=[];align=center;fontSize=11;"
     "verticalLabelPosition=bottom;verticalAlign=top;labelBackgroundColor=#ffffff;"
 )
 
 # Style for general icons (users, clients, etc.) using mxgraph library
-GENERAL_ICON_BASE_STYLE = (
+GENERAL_ICON_BASE_STYLE = sys.intern(
     "shape=image;html=1;verticalAlign=top;verticalLabelPosition=bottom;"
     "labelBackgroundColor=#ffffff;fontSize=11;align=center;"
 )
 
+# Everything before the image path, so icon styles are a single concatenation
+_AZURE_ICON_STYLE_PREFIX = sys.intern(AZURE_ICON_BASE_STYLE + "image=img/lib/azure2/")
+_GENERAL_ICON_STYLE_PREFIX = sys.intern(GENERAL_ICON_BASE_STYLE + "image=")
+
 # No longer using mxgraph - all icons use Azure2 SVG library which renders properly
 
 # Fallback style for shapes without specific icons - subtle gray box
@@ -57,22 +68,64 @@ FALLBACK_STYLE = (
 )
 
 
+@functools.lru_cache(maxsize=None)
 def get_azure_icon_style(image_path: str) -> str:
     """Generate Draw.io style string for an Azure icon using the Azure2 library."""
-    return f"{AZURE_ICON_BASE_STYLE}image=img/lib/azure2/{image_path};"
+    return _AZURE_ICON_STYLE_PREFIX + image_path + ";"
 
 
+@functools.lru_cache(maxsize=None)
 def get_general_icon_style(image_path: str) -> str:
     """Generate Draw.io style string for general icons (users, devices, etc.)."""
-    return f"{GENERAL_ICON_BASE_STYLE}image={image_path};"
+    return _GENERAL_ICON_STYLE_PREFIX + image_path + ";"
 
 
 def get_fallback_style(category: str, fill_color: Optional[str] = None) -> str:
-    """Generate fallback style for resources without specific icons."""
-    # Use the pre-defined fallback style (already has fill and stroke)
+    """Generate fallback style for resources without specific icons.
+    
+    The style does not depend on its arguments; internal callers use
+    FALLBACK_STYLE directly and this is kept for API compatibility.
+    """
     return FALLBACK_STYLE
 
 
+# Group container styles; only the fill color varies between calls
+# Compact box style for professional diagrams - solid gray fill, no stroke
+# Label positioned at top, vertically aligned to top
+_GROUP_BOX_TEMPLATE = (
+    "rounded=0;whiteSpace=wrap;html=1;"
+    "fillColor=%s;strokeColor=none;"
+    "verticalAlign=top;align=center;"
+    "fontSize=10;fontStyle=1;fontColor=#333333;"
+    "spacingTop=5;"
+)
+
+# Dashed outline for resource group boundaries
+_GROUP_DASHED_STYLE = (
+    "rounded=0;whiteSpace=wrap;html=1;dashed=1;"
+    "fillColor=none;strokeColor=#0078D4;strokeWidth=1;"
+    "verticalAlign=top;align=center;"
+    "fontSize=10;fontStyle=1;fontColor=#0078D4;"
+)
+
+# Swimlane style with title bar (default)
+_GROUP_SWIMLANE_TEMPLATE = (
+    "swimlane;whiteSpace=wrap;html=1;"
+    "fillColor=%s;fillOpacity=50;strokeColor=#0078D4;strokeWidth=2;"
+    "rounded=1;startSize=30;horizontal=1;"
+    "fontSize=12;fontStyle=1;fontColor=#0078D4;"
+    "shadow=0;glass=0;"
+)
+
+# Most groups don't set a color, so their styles are ready-made
+DEFAULT_GROUP_FILL = '#E6E6E6'
+_DEFAULT_GROUP_STYLES = {
+    'box': _GROUP_BOX_TEMPLATE % DEFAULT_GROUP_FILL,
+    'dashed': _GROUP_DASHED_STYLE,
+    'swimlane': _GROUP_SWIMLANE_TEMPLATE % DEFAULT_GROUP_FILL,
+}
+
+
 def get_group_style(color: Optional[str] = None, style: str = 'swimlane') -> str:
     """Generate Draw.io style string for a resource group (cluster/container).
     
@@ -80,35 +133,41 @@ def get_group_style(color: Optional[str] = None, style: str = 'swimlane') -> str
         color: Background fill color (hex)
         style: 'swimlane' for titled container, 'box' for simple compact rectangle
     """
-    fill = color or '#E6E6E6'
+    if color is None:
+        return _DEFAULT_GROUP_STYLES.get(style, _DEFAULT_GROUP_STYLES['swimlane'])
+    
+    if style == 'dashed':
+        return _GROUP_DASHED_STYLE
     
-    if style == 'box':
-        # Compact box style for professional diagrams - solid gray fill, no stroke
-        # Label positioned at top, vertically aligned to top
-        return (
-            "rounded=0;whiteSpace=wrap;html=1;"
-            f"fillColor={fill};strokeColor=none;"
-            "verticalAlign=top;align=center;"
-            "fontSize=10;fontStyle=1;fontColor=#333333;"
-            "spacingTop=5;"
-        )
-    elif style == 'dashed':
-        # Dashed outline for resource group boundaries
-        return (
-            "rounded=0;whiteSpace=wrap;html=1;dashed=1;"
-            "fillColor=none;strokeColor=#0078D4;strokeWidth=1;"
-            "verticalAlign=top;align=center;"
-            "fontSize=10;fontStyle=1;fontColor=#0078D4;"
-        )
-    else:
-        # Swimlane style with title bar (default)
-        return (
-            "swimlane;whiteSpace=wrap;html=1;"
-            f"fillColor={fill};fillOpacity=50;strokeColor=#0078D4;strokeWidth=2;"
-            "rounded=1;startSize=30;horizontal=1;"
-            "fontSize=12;fontStyle=1;fontColor=#0078D4;"
-            "shadow=0;glass=0;"
-        )
+    template = _GROUP_BOX_TEMPLATE if style == 'box' else _GROUP_SWIMLANE_TEMPLATE
+    return template % (color or DEFAULT_GROUP_FILL)
+
+
+def _build_edge_styles() -> Dict[Tuple[str, bool], str]:
+    """Precompute every (line style, filled arrow) edge style combination."""
+    patterns = {
+        'solid': "",
+        'dashed': "dashed=1;dashPattern=8 8;",
+        'dotted': "dashed=1;dashPattern=2 2;",
+    }
+    styles: Dict[Tuple[str, bool], str] = {}
+    
+    for style, pattern in patterns.items():
+        for filled_arrow in (False, True):
+            # Use hollow arrowhead (endFill=0) by default for cleaner professional look
+            end_fill = "1" if filled_arrow else "0"
+            styles[(style, filled_arrow)] = (
+                "edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;"
+                f"jettySize=auto;html=1;strokeWidth=2;strokeColor=#6c8ebf;"
+                f"endArrow=blockThin;endFill={end_fill};fillColor=#dae8fc;"
+                "labelBackgroundColor=none;"
+                f"{pattern}"
+            )
+    
+    return styles
+
+
+_EDGE_STYLES = _build_edge_styles()
 
 
 def get_edge_style(style: str = 'solid', filled_arrow: bool = False) -> str:
@@ -118,25 +177,31 @@ def get_edge_style(style: str = 'solid', filled_arrow: bool = False) -> str:
         style: Line style - 'solid', 'dashed', or 'dotted'
         filled_arrow: If True, use filled arrowhead; if False, use hollow (outline) arrowhead
     """
-    # Use hollow arrowhead (endFill=0) by default for cleaner professional look
-    end_fill = "1" if filled_arrow else "0"
-    base = (
-        "edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;"
-        f"jettySize=auto;html=1;strokeWidth=2;strokeColor=#6c8ebf;"
-        f"endArrow=blockThin;endFill={end_fill};fillColor=#dae8fc;"
-        "labelBackgroundColor=none;"
-    )
-    if style == 'dashed':
-        base += "dashed=1;dashPattern=8 8;"
-    elif style == 'dotted':
-        base += "dashed=1;dashPattern=2 2;"
-    return base
+    filled_arrow = bool(filled_arrow)
+    edge_style = _EDGE_STYLES.get((style, filled_arrow))
+    if edge_style is None:
+        # Unknown line styles render as solid
+        edge_style = _EDGE_STYLES[('solid', filled_arrow)]
+    return edge_style
+
+
+class ShapeDef(NamedTuple):
+    """Definition of an Azure shape: label, category and Azure2 icon path."""
+    display_name: str
+    category: str
+    icon_path: Optional[str]
+
+
+class ShapeListing(NamedTuple):
+    """Entry in the per-category shape listing returned by list_all_shapes."""
+    resource_type: str
+    display_name: str
 
 
 # Azure resource type to shape mapping
 # Maps resource_type strings to (display_name, category, azure2_icon_path or None for fallback)
 # Icon paths reference Draw.io's built-in Azure2 library: img/lib/azure2/<path>
-AZURE_SHAPES: Dict[str, Tuple[str, str, Optional[str]]] = {
+_AZURE_SHAPES_RAW: Dict[str, Tuple[str, str, Optional[str]]] = {
     # ========== Compute ==========
     'AVSVM': ('AVS VM', 'compute', 'other/AVS_VM.svg'),
     'ApplicationGroup': ('Application Group', 'compute', 'compute/Application_Group.svg'),
@@ -154,7 +219,6 @@ AZURE_SHAPES: Dict[str, Tuple[str, str, Optional[str]]] = {
     'DisksClassic': ('Disks Classic', 'compute', 'compute/Disks_Classic.svg'),
     'DisksSnapshot': ('Disks Snapshots', 'compute', 'compute/Disks_Snapshots.svg'),
     'FunctionApp': ('Function Apps', 'compute', 'compute/Function_Apps.svg'),
-    'FunctionApps': ('Function Apps', 'compute', 'compute/Function_Apps.svg'),  # Alias
     'Host': ('Hosts', 'compute', 'compute/Hosts.svg'),
     'HostGroup': ('Host Groups', 'compute', 'compute/Host_Groups.svg'),
     'HostPool': ('Host Pools', 'compute', 'compute/Host_Pools.svg'),
@@ -300,7 +364,6 @@ AZURE_SHAPES: Dict[str, Tuple[str, str, Optional[str]]] = {
     'APICenter': ('API Center', 'web', 'web/API_Center.svg'),
     'APIManagementService': ('API Management Services', 'web', 'app_services/API_Management_Services.svg'),
     'AppService': ('App Services', 'web', 'app_services/App_Services.svg'),
-    'AppServices': ('App Services', 'web', 'app_services/App_Services.svg'),  # Alias
     'AppServiceCertificate': ('App Service Certificates', 'web', 'app_services/App_Service_Certificates.svg'),
     'AppServiceDomain': ('App Service Domains', 'web', 'app_services/App_Service_Domains.svg'),
     'AppServiceEnvironment': ('App Service Environments', 'web', 'app_services/App_Service_Environments.svg'),
@@ -842,6 +905,14 @@ AZURE_SHAPES: Dict[str, Tuple[str, str, Optional[str]]] = {
 
 }
 
+# Wrap entries as ShapeDef and intern keys, display names and categories so the
+# many repeated strings share one object and lookups can short-circuit on identity.
+# Published read-only: the table is shared by every caller and must not be mutated.
+AZURE_SHAPES: Mapping[str, ShapeDef] = types.MappingProxyType({
+    sys.intern(resource_type): ShapeDef(sys.intern(display_name), sys.intern(category), icon_path)
+    for resource_type, (display_name, category, icon_path) in _AZURE_SHAPES_RAW.items()
+})
+
 # Alias mapping for common/intuitive names to actual AZURE_SHAPES keys
 # This helps when users type natural names that don't match exactly
 RESOURCE_TYPE_ALIASES: Dict[str, str] = {
@@ -872,7 +943,9 @@ RESOURCE_TYPE_ALIASES: Dict[str, str] = {
     'K8s': 'KubernetesServices',
     'WebApp': 'AppService',
     'App': 'AppService',
+    'AppServices': 'AppService',
     'Functions': 'FunctionApp',
+    'FunctionApps': 'FunctionApp',
     'Function': 'FunctionApp',
     'AzureFunctions': 'FunctionApp',
     'ContainerInstance': 'ContainerInstance',
@@ -971,6 +1044,57 @@ RESOURCE_TYPE_ALIASES: Dict[str, str] = {
 }
 
 
+def _build_resolved_shapes() -> Mapping[str, ShapeDef]:
+    """Map every accepted resource type name, aliases included, to its shape.
+    
+    An alias takes precedence over a shape key of the same name, and an alias
+    whose target doesn't exist leaves the name unresolved, exactly as the
+    alias-then-shape lookup always did.
+    """
+    resolved: Dict[str, ShapeDef] = dict(AZURE_SHAPES)
+    
+    for alias, target in RESOURCE_TYPE_ALIASES.items():
+        shape = AZURE_SHAPES.get(target)
+        if shape is not None:
+            resolved[alias] = shape
+        else:
+            resolved.pop(alias, None)
+    
+    return types.MappingProxyType(resolved)
+
+
+# Single-probe lookup for resource types as users write them (e.g. 'SQL').
+# Name not in here -> unknown type, drawn as a gray fallback box.
+RESOLVED_SHAPES = _build_resolved_shapes()
+
+
+def _build_shape_info_cache() -> Dict[str, Tuple[str, str, str]]:
+    """Precompute the (display_name, category, style_string) tuple for every shape.
+    
+    The shape tables are static, so the style strings only need to be built
+    once at import time rather than on every get_shape_info call. Keyed by
+    RESOLVED_SHAPES so aliases are a single probe too.
+    """
+    cache: Dict[str, Tuple[str, str, str]] = {}
+    
+    for resource_type, shape in RESOLVED_SHAPES.items():
+        if shape.icon_path:
+            # Use Draw.io Azure2 icon library
+            style = get_azure_icon_style(shape.icon_path)
+        else:
+            # Fallback to colored rectangle
+            style = FALLBACK_STYLE
+        cache[resource_type] = (shape.display_name, shape.category, style)
+    
+    return cache
+
+
+_SHAPE_INFO_CACHE = _build_shape_info_cache()
+
+# Bound lookup used by get_shape_info, saving the global + attribute lookup per call
+_lookup_shape_info = _SHAPE_INFO_CACHE.get
+
+
 def get_shape_info(resource_type: str) -> Tuple[str, str, str]:
     """
     Get shape information for a resource type.
@@ -980,35 +1104,33 @@ def get_shape_info(resource_type: str) -> Tuple[str, str, str]:
     Uses Draw.io's built-in Azure2 SVG icons for all resources.
     Supports aliases for common/intuitive names (e.g., 'SQL' -> 'AzureSQL').
     """
-    # First, check if this is an alias and resolve it
-    resolved_type = RESOURCE_TYPE_ALIASES.get(resource_type, resource_type)
+    info = _lookup_shape_info(resource_type)
+    if info is not None:
+        return info
     
-    if resolved_type in AZURE_SHAPES:
-        display_name, category, icon_path = AZURE_SHAPES[resolved_type]
-        
-        if icon_path:
-            # Use Draw.io Azure2 icon library
-            style = get_azure_icon_style(icon_path)
-        else:
-            # Fallback to colored rectangle
-            style = get_fallback_style(category)
-        
-        return (display_name, category, style)
-    else:
-        # Unknown resource type - use generic fallback style
-        return (resource_type, 'general', get_fallback_style('general'))
+    # Unknown resource type - use generic fallback style
+    return (resource_type, 'general', FALLBACK_STYLE)
 
 
-def list_all_shapes() -> Dict[str, list]:
-    """List all available shapes organized by category."""
-    categories: Dict[str, list] = {}
+def _build_shapes_by_category() -> Mapping[str, Tuple[ShapeListing, ...]]:
+    """Group all shapes by category once; the result never changes at runtime."""
+    categories: Dict[str, list] = defaultdict(list)
     
-    for resource_type, (display_name, category, _) in AZURE_SHAPES.items():
-        if category not in categories:
-            categories[category] = []
-        categories[category].append({
-            'resource_type': resource_type,
-            'display_name': display_name,
-        })
+    for resource_type, shape in AZURE_SHAPES.items():
+        categories[shape.category].append(ShapeListing(resource_type, shape.display_name))
     
-    return categories
+    return types.MappingProxyType(
+        {category: tuple(shapes) for category, shapes in categories.items()}
+    )
+
+
+_SHAPES_BY_CATEGORY = _build_shapes_by_category()
+
+
+def list_all_shapes() -> Mapping[str, Tuple[ShapeListing, ...]]:
+    """List all available shapes organized by category.
+    
+    The listing is built once at import and shared between callers,
+    so the returned mapping is read-only.
+    """
+    return _SHAPES_BY_CATEGORY
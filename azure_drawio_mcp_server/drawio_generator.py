@@ -1,12 +1,15 @@
 # Copyright (c) 2026. Inspired by dminkovski/azure-diagram-mcp
 """Draw.io diagram generation using drawpyo library."""
 
+import asyncio
+import html
 import os
+import shutil
 import subprocess
-import sys
 import uuid
 import tempfile
 import logging
+from collections import Counter, defaultdict
 from typing import Dict, List, Optional, Tuple
 
 import drawpyo
@@ -27,7 +30,8 @@ from azure_drawio_mcp_server.azure_shapes import (
     DEFAULT_HEIGHT,
     ICON_SIZE,
     AZURE_COLORS,
-    AZURE_SHAPES,
+    FALLBACK_STYLE,
+    RESOLVED_SHAPES,
 )
 from azure_drawio_mcp_server.topology_layout import (
     calculate_topology_layout,
@@ -66,38 +70,59 @@ LEGEND_HEADER_STYLE = (
     "collapsible=0;marginBottom=0;whiteSpace=wrap;html=1;fillColor=#0078D4;"
     "fontColor=#ffffff;strokeColor=#0078D4;rounded=1;"
 )
-LEGEND_ROW_STYLE = (
-    "text;strokeColor=#0078D4;fillColor=#ffffff;align=left;verticalAlign=middle;"
-    "spacingLeft=10;spacingRight=10;overflow=hidden;points=[[0,0.5],[1,0.5]];"
-    "portConstraint=eastwest;rotatable=0;whiteSpace=wrap;html=1;fontSize=11;"
-)
-LEGEND_ROW_ALT_STYLE = (
-    "text;strokeColor=#0078D4;fillColor=#F0F8FF;align=left;verticalAlign=middle;"
+# Data rows differ only in fill color (alternating stripes)
+_LEGEND_ROW_TEMPLATE = (
+    "text;strokeColor=#0078D4;fillColor=%s;align=left;verticalAlign=middle;"
     "spacingLeft=10;spacingRight=10;overflow=hidden;points=[[0,0.5],[1,0.5]];"
     "portConstraint=eastwest;rotatable=0;whiteSpace=wrap;html=1;fontSize=11;"
 )
+LEGEND_ROW_STYLE = _LEGEND_ROW_TEMPLATE % '#ffffff'
+LEGEND_ROW_ALT_STYLE = _LEGEND_ROW_TEMPLATE % '#F0F8FF'
+
+# Connection line styling - thin, light lines for cleaner look. These are
+# drawpyo Edge constructor arguments; drawpyo builds the style string on write.
+EDGE_PROPERTIES = {
+    'line_end_target': 'blockThin',
+    'stroke_color': '#999999',  # Light gray for less visual noise
+    'strokeWidth': 1,
+    'rounded': 1,  # Enable rounded corners for cleaner routing
+}
+
+# Line pattern per connection style
+# drawpyo uses: solid, dashed_small/medium/large, dotted_small/medium/large
+EDGE_PATTERNS = {
+    'dashed': 'dashed_medium',
+    'dotted': 'dotted_medium',
+}
 
 # XML declaration - required per drawio-ninja research for reliable file opening
 XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
 
+# C0 control characters are not allowed in XML 1.0 attributes (tab, LF, CR are)
+_XML_INVALID_CONTROL_CHARS = dict.fromkeys(
+    c for c in range(0x20) if chr(c) not in '\t\n\r'
+)
+
+
+def _label_text(text: str) -> str:
+    """Make user text safe for an html=1 label: drop XML-invalid control chars, escape markup."""
+    return html.escape(text.translate(_XML_INVALID_CONTROL_CHARS), quote=False)
+
 
-def _ensure_xml_declaration(file_path: str) -> None:
+def _write_drawio_file(file: drawpyo.File, output_path: str) -> None:
     """
-    Ensure the file starts with XML declaration.
+    Serialize the drawpyo file and write it with an XML declaration.
     
     Based on drawio-ninja research: Files missing XML declaration may fail
-    to open reliably in some Draw.io clients.
+    to open reliably in some Draw.io clients. drawpyo doesn't add one, so it
+    is prepended here before the single write (no read-back and rewrite).
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        if not content.strip().startswith('<?xml'):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(XML_DECLARATION + content)
-            logger.debug(f"Added XML declaration to {file_path}")
-    except Exception as e:
-        logger.warning(f"Could not add XML declaration: {e}")
+    content = file.xml
+    if not content.strip().startswith('<?xml'):
+        content = XML_DECLARATION + content
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(content)
 
 
 def _open_in_vscode(file_path: str) -> bool:
@@ -108,23 +133,19 @@ def _open_in_vscode(file_path: str) -> bool:
     Requires VS Code to be installed and the 'code' command in PATH.
     For Draw.io files, requires the hediet.vscode-drawio extension.
     """
+    # Resolve 'code' ourselves so no shell is needed (on Windows this finds code.cmd)
+    code_path = shutil.which('code')
+    if code_path is None:
+        logger.warning("VS Code 'code' command not found in PATH")
+        return False
+    
     try:
-        # Use 'code' command which works on Windows, macOS, and Linux
-        if sys.platform == 'win32':
-            # On Windows, use shell=True to find 'code' in PATH
-            subprocess.Popen(
-                ['code', file_path],
-                shell=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        else:
-            # On Unix-like systems
-            subprocess.Popen(
-                ['code', file_path],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
+        subprocess.Popen(
+            [code_path, file_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
         return True
     except FileNotFoundError:
         logger.warning("VS Code 'code' command not found in PATH")
@@ -138,7 +159,12 @@ def _calculate_layout(
     resources: List[AzureResource],
     groups: List[ResourceGroup],
     connections: Optional[List[Connection]] = None,
-) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, Tuple[int, int, int, int]]]:
+    group_y_offset: int = 0,
+) -> Tuple[
+    Dict[str, Tuple[int, int]],
+    Dict[str, Tuple[int, int]],
+    Dict[str, Tuple[int, int, int, int]],
+]:
     """
     Calculate positions for resources and bounds for groups.
     Creates a CLEAN layout constrained to A4 paper size (landscape).
@@ -149,36 +175,34 @@ def _calculate_layout(
     If connections are provided, uses topology-aware ordering to place
     source resources/groups first (left) and sink resources/groups last (right).
     
+    group_y_offset shifts groups down (e.g. below the instructions text);
+    ungrouped resources are not shifted.
+    
     Returns:
         - positions: Dict mapping resource ID to (x, y) position
           For ungrouped resources: absolute position on page
           For grouped resources: position RELATIVE to group origin (0,0 = top-left of group)
+        - absolute_positions: Dict mapping resource ID to (x, y) on the page,
+          used for edge routing
         - group_bounds: Dict mapping group ID to (x, y, width, height)
     """
     positions: Dict[str, Tuple[int, int]] = {}
+    absolute_positions: Dict[str, Tuple[int, int]] = {}
     group_bounds: Dict[str, Tuple[int, int, int, int]] = {}
     
-    # Use topology-aware ordering if connections provided
+    # Use topology-aware ordering if connections provided; it buckets every
+    # non-empty group (and None for ungrouped) itself
+    group_resources: Dict[Optional[str], List[AzureResource]]
     if connections:
         ordered_groups, group_resources, _ = calculate_topology_layout(
             resources, groups, connections
         )
     else:
+        # Separate resources by group (in request order)
         ordered_groups = groups
-        group_resources = {}
-        for r in resources:
-            if r.group not in group_resources:
-                group_resources[r.group] = []
-            group_resources[r.group].append(r)
-    
-    
-    # Separate resources by group (using topology order if available)
-    grouped: Dict[Optional[str], List[AzureResource]] = {}
-    for resource in resources:
-        group_id = resource.group
-        if group_id not in grouped:
-            grouped[group_id] = []
-        grouped[group_id].append(resource)
+        group_resources = defaultdict(list)
+        for resource in resources:
+            group_resources[resource.group].append(resource)
     
     current_x = START_X
     current_y = START_Y
@@ -186,20 +210,23 @@ def _calculate_layout(
     
     # Position ungrouped resources first (inline, left to right)
     # Use topology-ordered ungrouped resources if available
-    ungrouped_resources = group_resources.get(None, grouped.get(None, []))
+    ungrouped_resources = group_resources.get(None, [])
     if ungrouped_resources:
         for i, resource in enumerate(ungrouped_resources):
             if resource.x is not None and resource.y is not None:
-                positions[resource.id] = (resource.x, resource.y)
+                position = (resource.x, resource.y)
             else:
                 # Check if we need to wrap to next row
                 if current_x + ICON_CELL_WIDTH > CANVAS_WIDTH + PAGE_MARGIN:
                     current_x = START_X
                     current_y += ICON_CELL_HEIGHT
                     
-                positions[resource.id] = (current_x, current_y)
+                position = (current_x, current_y)
                 current_x += ICON_CELL_WIDTH
                 row_max_height = max(row_max_height, ICON_CELL_HEIGHT)
+            
+            positions[resource.id] = position
+            absolute_positions[resource.id] = position
         
         # Move to new row after ungrouped resources
         current_x = START_X
@@ -211,7 +238,7 @@ def _calculate_layout(
     # Simple grid layout within groups - easy for users to adjust
     for group in ordered_groups:
         # Get topology-ordered resources for this group
-        grp_resources = group_resources.get(group.id, grouped.get(group.id, []))
+        grp_resources = group_resources.get(group.id, [])
         if not grp_resources:
             continue
             
@@ -234,20 +261,23 @@ def _calculate_layout(
             current_y += row_max_height + GROUP_GAP
             row_max_height = 0
         
+        group_y = current_y + group_y_offset
+        
         # Position each resource RELATIVE to the group's origin
         # Resources are topology-ordered (sources first within group)
         for i, resource in enumerate(grp_resources):
             if resource.x is not None and resource.y is not None:
-                positions[resource.id] = (resource.x, resource.y)
+                rel_x, rel_y = resource.x, resource.y
             else:
-                col = i % cols
-                row = i // cols
+                row, col = divmod(i, cols)
                 rel_x = GROUP_INTERNAL_PAD + col * ICON_CELL_WIDTH
                 rel_y = GROUP_TITLE_HEIGHT + GROUP_INTERNAL_PAD + row * ICON_CELL_HEIGHT
-                positions[resource.id] = (rel_x, rel_y)
+            
+            positions[resource.id] = (rel_x, rel_y)
+            absolute_positions[resource.id] = (current_x + rel_x, group_y + rel_y)
         
         # Store group bounds
-        group_bounds[group.id] = (current_x, current_y, group_width, group_height)
+        group_bounds[group.id] = (current_x, group_y, group_width, group_height)
         
         # Track max height in this row
         row_max_height = max(row_max_height, group_height)
@@ -255,30 +285,13 @@ def _calculate_layout(
         # Move to next group position (horizontal)
         current_x += group_width + GROUP_GAP
     
-    return positions, group_bounds
-
-
-def _calculate_diagram_bottom(
-    positions: Dict[str, Tuple[int, int]],
-    group_bounds: Dict[str, Tuple[int, int, int, int]],
-) -> int:
-    """Calculate the bottom-most Y coordinate of the diagram content."""
-    max_y = START_Y
-    
-    # Check ungrouped resource positions
-    for x, y in positions.values():
-        max_y = max(max_y, y + DEFAULT_HEIGHT + 50)  # Resource height + label
-    
-    # Check group bottoms
-    for x, y, w, h in group_bounds.values():
-        max_y = max(max_y, y + h)
-    
-    return max_y
+    return positions, absolute_positions, group_bounds
 
 
 def _create_legend(
     page,
     resources: List[AzureResource],
+    labels: List[Tuple[str, str]],
     x: int,
     y: int,
 ) -> None:
@@ -286,7 +299,8 @@ def _create_legend(
     Create a legend table at the specified position (on separate A4 page area).
     
     The legend shows numbered resources with their name, type, and rationale.
-    Sized to fit within A4 width constraints.
+    Sized to fit within A4 width constraints. labels holds the HTML-escaped
+    resource name and the shape display name for each resource, in order.
     """
     # Calculate column widths - fit within A4 width (~1043px usable)
     COL_NUM = 35
@@ -333,23 +347,30 @@ def _create_legend(
     )
     current_y += ROW_HEIGHT
     
+    # Row markup only varies in the cell contents, so build the fixed parts once
+    row_open = (
+        "<table style='width:100%;border-collapse:collapse;'>"
+        "<tr>"
+        f"<td style='width:{COL_NUM}px;padding:4px;font-weight:bold;color:#0078D4;'>"
+    )
+    name_cell = f"</td><td style='width:{COL_NAME}px;padding:4px;'>"
+    type_cell = f"</td><td style='width:{COL_TYPE}px;padding:4px;color:#666;'>"
+    rationale_cell = f"</td><td style='width:{COL_RATIONALE}px;padding:4px;'>"
+    row_close = "</td></tr></table>"
+    
     # Create data rows - each positioned manually
-    for idx, resource in enumerate(resources, 1):
+    for idx, (resource, (name, display_type)) in enumerate(zip(resources, labels), 1):
         row = drawpyo_objects.Object(page=page)
         
-        # Get display name for the type
-        display_type, _, _ = get_shape_info(resource.resource_type)
-        rationale = resource.rationale or "—"
-        
-        row.value = (
-            f"<table style='width:100%;border-collapse:collapse;'>"
-            f"<tr>"
-            f"<td style='width:{COL_NUM}px;padding:4px;font-weight:bold;color:#0078D4;'>{idx}</td>"
-            f"<td style='width:{COL_NAME}px;padding:4px;'>{resource.name}</td>"
-            f"<td style='width:{COL_TYPE}px;padding:4px;color:#666;'>{display_type}</td>"
-            f"<td style='width:{COL_RATIONALE}px;padding:4px;'>{rationale}</td>"
-            f"</tr></table>"
-        )
+        rationale = _label_text(resource.rationale) if resource.rationale else "—"
+        
+        row.value = "".join((
+            row_open, str(idx),
+            name_cell, name,
+            type_cell, display_type,
+            rationale_cell, rationale,
+            row_close,
+        ))
         row.position = (x, current_y)
         row.width = TABLE_WIDTH
         row.height = ROW_HEIGHT
@@ -395,8 +416,8 @@ def _determine_output_path(
         workspace_path = _resolve_workspace_path(workspace_dir)
         
         if workspace_path:
-            # Check if path already includes 'diagrams' subdirectory
-            if 'diagrams' in workspace_path.lower():
+            # Check if path already is the 'diagrams' subdirectory
+            if os.path.basename(os.path.normpath(workspace_path)).lower() == 'diagrams':
                 output_dir = workspace_path
             else:
                 output_dir = os.path.join(workspace_path, 'diagrams')
@@ -459,13 +480,19 @@ def validate_diagram_request(request: DiagramRequest) -> Dict[str, List[str]]:
         )
         return result
     
-    # Check resource types for valid icons
-    from azure_drawio_mcp_server.azure_shapes import AZURE_SHAPES, RESOURCE_TYPE_ALIASES
+    # Check for duplicate IDs
+    id_counts = Counter(r.id for r in request.resources)
+    duplicates = [rid for rid, count in id_counts.items() if count > 1]
+    if duplicates:
+        result['errors'].append(
+            f"Duplicate resource IDs found: {', '.join(duplicates)}. Each resource must have a unique id."
+        )
+        return result
     
+    # Check resource types for valid icons (RESOLVED_SHAPES includes aliases)
     unknown_types = []
     for res in request.resources:
-        resolved = RESOURCE_TYPE_ALIASES.get(res.resource_type, res.resource_type)
-        if resolved not in AZURE_SHAPES:
+        if res.resource_type not in RESOLVED_SHAPES:
             unknown_types.append(f"{res.name} ({res.resource_type})")
     
     if unknown_types:
@@ -483,9 +510,8 @@ def validate_diagram_request(request: DiagramRequest) -> Dict[str, List[str]]:
         )
     else:
         # Check for resources without groups
-        grouped_resources = {r.id for r in request.resources if r.group}
-        ungrouped = [r.name for r in request.resources if r.id not in grouped_resources]
-        if ungrouped and len(ungrouped) > len(request.resources) / 2:
+        ungrouped_count = sum(1 for r in request.resources if not r.group)
+        if ungrouped_count > len(request.resources) / 2:
             result['warnings'].append(
                 f"Most resources are ungrouped. Assign resources to groups using the 'group' field."
             )
@@ -510,14 +536,6 @@ def validate_diagram_request(request: DiagramRequest) -> Dict[str, List[str]]:
                 + (f" and {len(orphans) - 3} more" if len(orphans) > 3 else "")
             )
     
-    # Check for duplicate IDs
-    ids = [r.id for r in request.resources]
-    duplicates = [id for id in ids if ids.count(id) > 1]
-    if duplicates:
-        result['errors'].append(
-            f"Duplicate resource IDs found: {', '.join(set(duplicates))}. Each resource must have a unique id."
-        )
-    
     # Provide helpful tips based on resource count
     if len(request.resources) > 15:
         result['tips'].append(
@@ -528,26 +546,24 @@ def validate_diagram_request(request: DiagramRequest) -> Dict[str, List[str]]:
     return result
 
 
+# (validation key, section header) in display order
+VALIDATION_SECTIONS = (
+    ('errors', "❌ **Errors (must fix):**"),
+    ('warnings', "⚠️ **Warnings:**"),
+    ('tips', "💡 **Tips for better diagrams:**"),
+)
+
+
 def format_validation_message(validation: Dict[str, List[str]]) -> str:
     """Format validation results as a user-friendly message."""
-    lines = []
-    
-    if validation['errors']:
-        lines.append("❌ **Errors (must fix):**")
-        for err in validation['errors']:
-            lines.append(f"   • {err}")
+    sections = []
     
-    if validation['warnings']:
-        lines.append("⚠️ **Warnings:**")
-        for warn in validation['warnings']:
-            lines.append(f"   • {warn}")
+    for key, header in VALIDATION_SECTIONS:
+        items = validation[key]
+        if items:
+            sections.append(header + "\n   • " + "\n   • ".join(items))
     
-    if validation['tips']:
-        lines.append("💡 **Tips for better diagrams:**")
-        for tip in validation['tips']:
-            lines.append(f"   • {tip}")
-    
-    return "\n".join(lines)
+    return "\n".join(sections)
 
 
 async def generate_drawio_diagram(
@@ -560,6 +576,10 @@ async def generate_drawio_diagram(
     - Draw.io desktop application
     - VS Code with Draw.io extension (hediet.vscode-drawio)
     - draw.io web application
+    
+    Directory creation and the final serialization/write run in the default
+    thread pool, so concurrent requests may interleave while a large diagram
+    is being written.
     """
     try:
         # Validate request and provide guidance
@@ -584,7 +604,7 @@ async def generate_drawio_diagram(
             request.filename
         )
         
-        os.makedirs(output_dir, exist_ok=True)
+        await asyncio.to_thread(os.makedirs, output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, filename)
         
         # Create Draw.io file and page
@@ -610,7 +630,7 @@ async def generate_drawio_diagram(
         
         # Add instruction text at top of diagram if enabled
         instructions_height = 0
-        if getattr(request, 'show_instructions', True):
+        if request.show_instructions:
             canvas_mode = "infinite canvas" if request.use_infinite_canvas else "A4 landscape"
             instructions_text = (
                 "<i>This is your generated Azure architecture diagram. "
@@ -632,69 +652,65 @@ async def generate_drawio_diagram(
         
         # Calculate layout for all resources and groups
         # Uses topology-aware ordering when connections are provided
-        positions, group_bounds = _calculate_layout(
+        # Groups are offset below the instructions text, if any
+        positions, absolute_positions, group_bounds = _calculate_layout(
             request.resources, 
             request.groups,
             request.connections,  # Enable topology-aware layout
+            group_y_offset=instructions_height,
         )
         
-        # Offset all positions by instructions height
-        if instructions_height > 0:
-            # Offset group bounds
-            group_bounds = {
-                gid: (x, y + instructions_height, w, h) 
-                for gid, (x, y, w, h) in group_bounds.items()
-            }
-        
         # Track created objects for edge connections
         objects: Dict[str, drawpyo_objects.Object] = {}
         
         # Create groups/clusters first (as container objects)
         group_objects: Dict[str, drawpyo_objects.Object] = {}
         for group in request.groups:
-            if group.id not in group_bounds:
+            bounds = group_bounds.get(group.id)
+            if bounds is None:
                 continue  # Skip groups with no resources
             
-            x, y, width, height = group_bounds[group.id]
+            x, y, width, height = bounds
             
             group_obj = drawpyo_objects.Object(page=page)
-            group_obj.value = group.name
+            group_obj.value = _label_text(group.name)
             group_obj.position = (x, y)
             # Set width and height directly (size tuple setter doesn't work in drawpyo)
             group_obj.width = width
             group_obj.height = height
             
             # Apply group style - use the style specified or default to box (compact)
-            color = group.color or '#E6E6E6'
+            # A missing color takes get_group_style's precomputed default path
             group_style = group.style or 'box'
-            group_obj.apply_style_string(get_group_style(color, group_style))
+            group_obj.apply_style_string(get_group_style(group.color or None, group_style))
             
             group_objects[group.id] = group_obj
         
         # Build resource index map for numbering (matches legend order)
         resource_index = {res.id: idx + 1 for idx, res in enumerate(request.resources)}
         
-        # Import alias resolver to check if resource type has an icon
-        from azure_drawio_mcp_server.azure_shapes import RESOURCE_TYPE_ALIASES
+        # Show numbers if explicitly requested OR if legend is shown (for cross-reference)
+        show_numbers = request.show_resource_numbers or request.show_legend
         
         # Create resource shapes - nest inside groups when applicable
+        legend_labels: List[Tuple[str, str]] = []  # Reused for the legend rows
         for resource in request.resources:
             display_name, category, style = get_shape_info(resource.resource_type)
             
+            # Labels are rendered as HTML (html=1), so escape user text once.
+            # Unknown types come back from get_shape_info as the raw resource_type.
+            name = _label_text(resource.name)
+            display_name = _label_text(display_name)
+            legend_labels.append((name, display_name))
+            
             # Determine if this resource belongs to a group
-            parent_group = None
-            if resource.group and resource.group in group_objects:
-                parent_group = group_objects[resource.group]
+            parent_group = group_objects.get(resource.group) if resource.group else None
             
             # Get the resource number for labeling
             res_num = resource_index.get(resource.id, 0)
             
-            # Check if this resource type uses an icon (resolve aliases first)
-            resolved_type = RESOURCE_TYPE_ALIASES.get(resource.resource_type, resource.resource_type)
-            has_icon = (
-                resolved_type in AZURE_SHAPES 
-                and AZURE_SHAPES[resolved_type][2] is not None
-            )
+            # Unknown types and shapes without an icon both get the fallback box style
+            has_icon = style != FALLBACK_STYLE
             
             # Create the object with parent set during construction for proper nesting
             # When parent is set, positions become relative to parent's origin
@@ -706,23 +722,20 @@ async def generate_drawio_diagram(
             else:
                 obj = drawpyo_objects.Object(page=page)
             
-            # Show numbers if explicitly requested OR if legend is shown (for cross-reference)
-            show_numbers = request.show_resource_numbers or request.show_legend
-            
             if has_icon:
                 # For icons, show ONLY the number and user's name - clean and simple
                 if show_numbers:
-                    obj.value = f"[{res_num}] {resource.name}"
+                    obj.value = f"[{res_num}] {name}"
                 else:
-                    obj.value = resource.name
+                    obj.value = name
                 obj.width = ICON_SIZE
                 obj.height = ICON_SIZE
             else:
                 # For fallback shapes (gray box), show name and type so user knows what it is
                 if show_numbers:
-                    obj.value = f"[{res_num}] {resource.name}\n({display_name})"
+                    obj.value = f"[{res_num}] {name}\n({display_name})"
                 else:
-                    obj.value = f"{resource.name}\n({display_name})"
+                    obj.value = f"{name}\n({display_name})"
                 obj.width = DEFAULT_WIDTH
                 obj.height = DEFAULT_HEIGHT
             
@@ -739,22 +752,15 @@ async def generate_drawio_diagram(
             
             objects[resource.id] = obj
         
-        # Build absolute position map for edge routing
-        # For grouped resources, add group origin to get absolute position
-        absolute_positions: Dict[str, Tuple[int, int]] = {}
-        for resource in request.resources:
-            rel_x, rel_y = positions[resource.id]
-            if resource.group and resource.group in group_bounds:
-                gx, gy, gw, gh = group_bounds[resource.group]
-                absolute_positions[resource.id] = (gx + rel_x, gy + rel_y)
-            else:
-                absolute_positions[resource.id] = (rel_x, rel_y)
-        
         # Pre-analyze connections for edge spreading
         # Track connections per resource per direction (right/left/top/bottom)
         # Key: (resource_id, direction) -> list of connection indices
-        outgoing_by_direction: Dict[Tuple[str, str], List[int]] = {}
-        incoming_by_direction: Dict[Tuple[str, str], List[int]] = {}
+        outgoing_by_direction: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        incoming_by_direction: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        
+        # Connection index -> its position within its (resource, direction) list
+        outgoing_position: Dict[int, int] = {}
+        incoming_position: Dict[int, int] = {}
         
         # First pass: classify each connection by direction
         connection_directions: List[Tuple[str, str]] = []  # (exit_dir, entry_dir) per connection
@@ -783,16 +789,12 @@ async def generate_drawio_diagram(
             connection_directions.append((exit_dir, entry_dir))
             
             # Track this connection for its source (outgoing) and target (incoming)
-            src_key = (conn.source, exit_dir)
-            tgt_key = (conn.target, entry_dir)
-            
-            if src_key not in outgoing_by_direction:
-                outgoing_by_direction[src_key] = []
-            outgoing_by_direction[src_key].append(i)
-            
-            if tgt_key not in incoming_by_direction:
-                incoming_by_direction[tgt_key] = []
-            incoming_by_direction[tgt_key].append(i)
+            out_list = outgoing_by_direction[(conn.source, exit_dir)]
+            in_list = incoming_by_direction[(conn.target, entry_dir)]
+            outgoing_position[i] = len(out_list)
+            incoming_position[i] = len(in_list)
+            out_list.append(i)
+            in_list.append(i)
         
         def _get_spread_position(index: int, total: int) -> float:
             """
@@ -809,21 +811,22 @@ async def generate_drawio_diagram(
         
         # Create connections/edges with spreading
         for i, conn in enumerate(request.connections):
-            if conn.source not in objects or conn.target not in objects:
+            source_obj = objects.get(conn.source)
+            target_obj = objects.get(conn.target)
+            if source_obj is None or target_obj is None:
                 logger.warning(
                     f"Connection references unknown resource: "
                     f"{conn.source} -> {conn.target}"
                 )
                 continue
             
-            source_obj = objects[conn.source]
-            target_obj = objects[conn.target]
-            
             # Use orthogonal edges with edge-to-edge connections
             edge = drawpyo.diagram.Edge(
                 page=page,
                 source=source_obj,
                 target=target_obj,
+                pattern=EDGE_PATTERNS.get(conn.style, 'solid'),
+                **EDGE_PROPERTIES,
             )
             
             if conn.label:
@@ -837,13 +840,13 @@ async def generate_drawio_diagram(
             tgt_key = (conn.target, entry_dir)
             
             # Find this connection's index within its group
-            out_list = outgoing_by_direction.get(src_key, [i])
-            in_list = incoming_by_direction.get(tgt_key, [i])
-            out_idx = out_list.index(i) if i in out_list else 0
-            in_idx = in_list.index(i) if i in in_list else 0
+            out_idx = outgoing_position.get(i, 0)
+            in_idx = incoming_position.get(i, 0)
+            out_len = len(outgoing_by_direction.get(src_key, (i,)))
+            in_len = len(incoming_by_direction.get(tgt_key, (i,)))
             
-            exit_spread = _get_spread_position(out_idx, len(out_list))
-            entry_spread = _get_spread_position(in_idx, len(in_list))
+            exit_spread = _get_spread_position(out_idx, out_len)
+            entry_spread = _get_spread_position(in_idx, in_len)
             
             # Apply connection points based on direction with spreading
             if exit_dir == 'right':
@@ -871,32 +874,15 @@ async def generate_drawio_diagram(
             else:  # bottom
                 edge.entryX = entry_spread
                 edge.entryY = 1
-            
-            # Set edge properties - thin, light lines for cleaner look
-            edge.endArrow = 'blockThin'
-            edge.strokeColor = '#999999'  # Light gray for less visual noise
-            edge.strokeWidth = 1
-            edge.rounded = 1  # Enable rounded corners for cleaner routing
-            
-            # Apply line pattern for dashed/dotted styles
-            # drawpyo uses: solid, dashed_small/medium/large, dotted_small/medium/large
-            if conn.style == 'dashed':
-                edge.pattern = 'dashed_medium'
-            elif conn.style == 'dotted':
-                edge.pattern = 'dotted_medium'
         
         # Create legend if requested - placed on "second A4 page" below main diagram
         if request.show_legend and len(request.resources) > 0:
             # Place legend on a new "page" - offset by A4_HEIGHT + gap
             legend_y = A4_HEIGHT + PAGE_MARGIN  # Start of second A4 page
-            _create_legend(page, request.resources, START_X, legend_y)
-        
-        # Write the file
-        file.write()
+            _create_legend(page, request.resources, legend_labels, START_X, legend_y)
         
-        # Ensure XML declaration is present (drawpyo doesn't add it by default)
-        # Based on drawio-ninja research, this is required for reliable file opening
-        _ensure_xml_declaration(output_path)
+        # Write the file, with the XML declaration drawpyo doesn't add by default
+        await asyncio.to_thread(_write_drawio_file, file, output_path)
         
         # Verify file was created and validate structure
         if os.path.exists(output_path):
@@ -165,10 +165,10 @@ async def mcp_list_azure_shapes(
     for category, shapes in filtered.items():
         result[category] = []
         for shape in shapes:
-            _, _, style = get_shape_info(shape['resource_type'])
+            _, _, style = get_shape_info(shape.resource_type)
             result[category].append(ShapeInfo(
-                resource_type=shape['resource_type'],
-                display_name=shape['display_name'],
+                resource_type=shape.resource_type,
+                display_name=shape.display_name,
                 category=category,
                 style=style,
             ))
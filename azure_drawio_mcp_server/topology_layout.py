@@ -50,6 +50,7 @@ def build_adjacency_graph(
 def assign_layers(
     resources: List[AzureResource],
     connections: List[Connection],
+    graph: Optional[Tuple[Dict[str, List[str]], Dict[str, List[str]]]] = None,
 ) -> Dict[str, int]:
     """
     Assign resources to layers using topological ordering.
@@ -59,11 +60,18 @@ def assign_layers(
     
     This creates a natural left-to-right or top-to-bottom flow.
     
+    Args:
+        graph: Optional (outgoing, incoming) from build_adjacency_graph, to
+            reuse an already-built graph for these connections
+    
     Returns:
         Dict mapping resource ID to layer number (0-indexed)
     """
     resource_ids = {r.id for r in resources}
-    outgoing, incoming, out_degree, in_degree = build_adjacency_graph(connections)
+    if graph is None:
+        outgoing, incoming, _, _ = build_adjacency_graph(connections)
+    else:
+        outgoing, incoming = graph
     
     # Find sources (nodes with no incoming edges within our resource set)
     sources = []
@@ -130,16 +138,24 @@ def detect_hubs(
     resources: List[AzureResource],
     connections: List[Connection],
     threshold: int = HUB_CONNECTIVITY_THRESHOLD,
+    graph: Optional[Tuple[Dict[str, List[str]], Dict[str, List[str]]]] = None,
 ) -> Dict[str, int]:
     """
     Detect hub resources based on connectivity.
     
     A hub is a resource with connections >= threshold.
     
+    Args:
+        graph: Optional (outgoing, incoming) from build_adjacency_graph, to
+            reuse an already-built graph for these connections
+    
     Returns:
         Dict mapping resource ID to connectivity score (only for hubs)
     """
-    outgoing, incoming, _, _ = build_adjacency_graph(connections)
+    if graph is None:
+        outgoing, incoming, _, _ = build_adjacency_graph(connections)
+    else:
+        outgoing, incoming = graph
     hubs = {}
     
     for r in resources:
@@ -367,11 +383,13 @@ def optimize_group_order(
     groups: List[ResourceGroup],
     resources: List[AzureResource],
     connections: List[Connection],
+    layers: Optional[Dict[str, int]] = None,
 ) -> List[ResourceGroup]:
     """
     Reorder groups based on the topology of their contained resources.
     
     Groups containing source resources come first, groups with sinks come last.
+    Pass layers from assign_layers to avoid recomputing them.
     """
     if not groups or not connections:
         return groups
@@ -383,7 +401,8 @@ def optimize_group_order(
             resource_to_group[r.id] = r.group
     
     # Calculate average layer per group
-    layers = assign_layers(resources, connections)
+    if layers is None:
+        layers = assign_layers(resources, connections)
     group_avg_layer: Dict[str, float] = {}
     group_resource_count: Dict[str, int] = defaultdict(int)
     group_layer_sum: Dict[str, float] = defaultdict(float)
@@ -422,17 +441,18 @@ def calculate_topology_layout(
         - group_resources: Dict mapping group ID to ordered list of resources
         - hubs: Dict mapping hub resource ID to connectivity score
     """
-    # Build graph
+    # Build graph once; the steps below all reuse it
     outgoing, incoming, _, _ = build_adjacency_graph(connections)
+    graph = (outgoing, incoming)
     
     # Assign layers
-    layers = assign_layers(resources, connections)
+    layers = assign_layers(resources, connections, graph=graph)
     
     # Detect hubs
-    hubs = detect_hubs(resources, connections)
+    hubs = detect_hubs(resources, connections, graph=graph)
     
     # Optimize group order
-    ordered_groups = optimize_group_order(groups, resources, connections)
+    ordered_groups = optimize_group_order(groups, resources, connections, layers=layers)
     
     # Group resources by their group
     resources_by_group: Dict[Optional[str], List[AzureResource]] = defaultdict(list)